@@ -7,16 +7,17 @@ and generates markdown files for all articles using the existing
 markdown generation features.
 
 Usage:
-    python3 generate-vital-articles-md.py [--levels 1 2 3] [--dl-image yes|no] [--resume]
+    python3 generate-vital-articles-md.py [--levels 1 2 3] [--dl-image yes|no] [--resume] [--workers 32]
 
 Output:
     Markdown files in md_output/vital_articles/levelN/ directories
 """
 
 import os
-import json
+import orjson
+import asyncio
 import argparse
-import wikipedia
+import aiohttp
 from tqdm import tqdm
 from datetime import datetime
 import re
@@ -26,6 +27,41 @@ import re
 JSON_DIR = "vital_articles_data"
 OUTPUT_BASE_DIR = "md_output/vital_articles"
 
+# MediaWiki Action API endpoint, formatted with the language code
+API_URL = "https://{lang}.wikipedia.org/w/api.php"
+
+HEADERS = {
+    'User-Agent': 'Wikipedia-Markdown-Generator/1.0 (https://github.com/erictherobot/wikipedia-markdown-generator; Educational purposes)'
+}
+
+# Number of articles fetched concurrently (fetching is network-bound)
+DEFAULT_WORKERS = 32
+
+# Characters that are not allowed in file names on common platforms
+_SAFE_FILENAME_TABLE = str.maketrans({c: '_' for c in '/\\:*?"<>|'})
+
+# Precompiled patterns used by clean_content
+_RE_MATHSTYLE = re.compile(r'\s*\{\s*\\[a-z]+style[^}]*\}')
+_RE_DISPLAYSTYLE = re.compile(r'\{[^}]*displaystyle[^}]*\}')
+_RE_LATEX_PAREN = re.compile(r'\([^)]*\\[a-z]+[^)]*\)')
+# Matches a "== Heading ==", "=== Heading ===", "=### Heading=" line
+_RE_HEADING = re.compile(r'(=+)[ \t]*(#{0,6})[ \t]*([^=\n]+?)[ \t]*=+[ \t]*$')
+# Starts with a literal '(', so searching for it is much cheaper than
+# running _RE_EMPTY_PAREN, whose leading \s+ is tried at every whitespace
+_RE_PAREN_PAIR = re.compile(r'\(\s*\)')
+_RE_EMPTY_PAREN = re.compile(r'\s+\(\s*\)')
+
+
+def _heading_replacement(match):
+    """
+    Build a markdown heading from a Wikipedia heading match.
+    An explicit run of '#' wins; otherwise the level follows the '=' count.
+    """
+    equals, hashes, title = match.groups()
+    if not hashes:
+        hashes = '#' * {3: 3, 4: 4}.get(len(equals), 2)
+    return f"{hashes} {title}"
+
 
 def clean_content(content):
     """
@@ -37,67 +73,110 @@ def clean_content(content):
     Returns:
         Cleaned content string
     """
-    # Remove LaTeX/math formulas (they don't render well in plain markdown)
-    content = re.sub(r'\s*\{\s*\\[a-z]+style[^}]*\}', '', content)
-    content = re.sub(r'\{[^}]*displaystyle[^}]*\}', '[formula]', content)
-    content = re.sub(r'\([^)]*\\[a-z]+[^)]*\)', '', content)
+    # Remove LaTeX/math formulas (they don't render well in plain markdown).
+    # Most articles have none, so skip the passes unless they can match.
+    if 'style' in content:
+        content = _RE_MATHSTYLE.sub('', content)
+        content = _RE_DISPLAYSTYLE.sub('[formula]', content)
+    if '\\' in content:
+        content = _RE_LATEX_PAREN.sub('', content)
+    
+    # Convert heading markers (including malformed ones such as
+    # =### Heading=) to markdown and collapse runs of blank lines
+    # in a single pass over the lines
+    lines = []
+    previous_blank = False
+    for line in content.split('\n'):
+        if not line:
+            if previous_blank:
+                continue
+            previous_blank = True
+        else:
+            previous_blank = False
+            if line[0] == '=':
+                match = _RE_HEADING.match(line)
+                if match:
+                    line = _heading_replacement(match)
+        lines.append(line)
+    content = '\n'.join(lines)
     
-    # Clean up malformed headings with extra = signs
-    # Pattern: =### Heading= or === Heading ===
-    content = re.sub(r'^=+(#{1,6})\s*([^=\n]+?)\s*=+$', r'\1 \2', content, flags=re.MULTILINE)
-    content = re.sub(r'^=+\s*([^=\n]+?)\s*=+$', r'## \1', content, flags=re.MULTILINE)
+    # Clean up parenthetical notes that are artifacts
+    if _RE_PAREN_PAIR.search(content):
+        content = _RE_EMPTY_PAREN.sub('', content)
     
-    # Convert Wikipedia heading markers to markdown
-    content = re.sub(r'^====\s*([^=]+?)\s*====\s*$', r'#### \1', content, flags=re.MULTILINE)
-    content = re.sub(r'^===\s*([^=]+?)\s*===\s*$', r'### \1', content, flags=re.MULTILINE)
-    content = re.sub(r'^==\s*([^=]+?)\s*==\s*$', r'## \1', content, flags=re.MULTILINE)
+    return content.strip()
+
+
+async def fetch_page(session, title, lang='en'):
+    """
+    Fetch the plain-text content of an article from the MediaWiki API.
+    Title normalization (The_arts -> The arts) and redirects are resolved
+    by the API.
     
-    # Remove excessive blank lines
-    content = re.sub(r'\n{3,}', '\n\n', content)
+    Args:
+        session: aiohttp client session
+        title: Article title
+        lang: Wikipedia language code
+        
+    Returns:
+        Page data (title, fullurl, extract, ...), or None if the API
+        returned no page
+    """
+    params = {
+        'action': 'query',
+        'format': 'json',
+        'formatversion': '2',
+        'prop': 'extracts|info|pageprops',
+        'explaintext': '1',
+        'inprop': 'url',
+        'ppprop': 'disambiguation',
+        'redirects': '1',
+        'titles': title,
+    }
     
-    # Clean up parenthetical notes that are artifacts
-    content = re.sub(r'\s+\(\s*\)', '', content)
+    async with session.get(API_URL.format(lang=lang), params=params) as response:
+        response.raise_for_status()
+        data = await response.json()
     
-    return content.strip()
+    if 'error' in data:
+        raise RuntimeError(data['error'].get('info', data['error']))
+    
+    pages = data.get('query', {}).get('pages', [])
+    return pages[0] if pages else None
 
 
-def generate_markdown(topic, download_images=False):
+def generate_markdown(page, download_images=False):
     """
     Generate markdown for a Wikipedia article.
     Improved version with better content cleanup.
     
     Args:
-        topic: Article title
+        page: Page data returned by fetch_page, or None
         download_images: Whether to download images
         
     Returns:
         Tuple of (success: bool, markdown_text: str or None, error_msg: str or None)
     """
-    try:
-        page = wikipedia.page(topic, auto_suggest=False)
-    except wikipedia.exceptions.DisambiguationError as e:
-        return (False, None, f"Disambiguation page: {e.options[:3]}")
-    except wikipedia.exceptions.PageError:
+    if page is None or page.get('missing') or page.get('invalid'):
         return (False, None, f"Page not found")
-    except Exception as e:
-        return (False, None, f"Error: {str(e)}")
+    if 'disambiguation' in page.get('pageprops', {}):
+        return (False, None, "Disambiguation page")
+    if not page.get('extract'):
+        return (False, None, "No content returned")
 
     # Start with title
-    markdown_text = f"# {page.title}\n\n"
+    markdown_text = f"# {page['title']}\n\n"
     
     # Get and clean content
-    cleaned_content = clean_content(page.content)
+    cleaned_content = clean_content(page['extract'])
     
     # Add the cleaned content
     markdown_text += cleaned_content
     
     # Optional: Add source link at the end
-    markdown_text += f"\n\n---\n*Source: {page.url}*\n"
+    markdown_text += f"\n\n---\n*Source: {page['fullurl']}*\n"
 
     if download_images:
-        import requests
-        import urllib.parse
-        
         # Note: Images are downloaded but not embedded in the markdown
         # to keep the file structure simple. The image downloading
         # feature can be enhanced in future versions.
@@ -106,6 +185,34 @@ def generate_markdown(topic, download_images=False):
     return (True, markdown_text, None)
 
 
+async def generate_markdown_async(session, semaphore, topic, download_images=False, lang='en'):
+    """
+    Fetch an article and generate its markdown.
+    The content cleanup runs in the default executor so the event loop
+    keeps other requests moving.
+    
+    Args:
+        session: aiohttp client session
+        semaphore: Semaphore limiting the number of requests in flight
+        topic: Article title
+        download_images: Whether to download images
+        lang: Wikipedia language code
+        
+    Returns:
+        Tuple of (topic, success, markdown_text, error_msg)
+    """
+    try:
+        async with semaphore:
+            page = await fetch_page(session, topic, lang)
+    except Exception as e:
+        return (topic, False, None, f"Error: {str(e) or type(e).__name__}")
+    
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(None, generate_markdown, page, download_images)
+    
+    return (topic, *result)
+
+
 def load_json_file(level):
     """
     Load the JSON file for a specific level.
@@ -123,36 +230,37 @@ def load_json_file(level):
         print(f"Please run scrape-vital-articles.py first to generate the JSON files.")
         return None
     
-    with open(filename, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(filename, 'rb') as f:
+        return orjson.loads(f.read())
 
 
-def save_markdown(level, topic, markdown_text):
+def save_markdown(level_dir, safe_filename, markdown_text):
     """
     Save markdown content to a file.
     
     Args:
-        level: The level number
-        topic: Article title
+        level_dir: Output directory of the level (must already exist)
+        safe_filename: Sanitized article title, used as the file name
         markdown_text: Markdown content
         
     Returns:
         Path to the saved file
     """
-    level_dir = os.path.join(OUTPUT_BASE_DIR, f"level{level}")
-    os.makedirs(level_dir, exist_ok=True)
-    
-    # Sanitize filename
-    safe_filename = topic.replace('/', '_').replace('\\', '_')
     filename = os.path.join(level_dir, f"{safe_filename}.md")
     
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(markdown_text)
+    # Encode once and write the raw bytes, bypassing the text I/O layer
+    data = memoryview(markdown_text.encode('utf-8'))
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
     
     return filename
 
 
-def process_level(level, download_images=False, resume=False):
+async def process_level(level, download_images=False, resume=False, workers=DEFAULT_WORKERS, lang='en'):
     """
     Process all articles for a specific level.
     
@@ -160,6 +268,8 @@ def process_level(level, download_images=False, resume=False):
         level: The level number
         download_images: Whether to download images
         resume: Whether to skip already-downloaded articles
+        workers: Number of articles to fetch concurrently
+        lang: Wikipedia language code
         
     Returns:
         Statistics dictionary
@@ -188,37 +298,61 @@ def process_level(level, download_images=False, resume=False):
         'errors': []
     }
     
-    # Create error log file
-    log_dir = os.path.join(OUTPUT_BASE_DIR, f"level{level}")
-    os.makedirs(log_dir, exist_ok=True)
-    error_log_file = os.path.join(log_dir, f"errors_level{level}.log")
+    # Create the output directory once; it also holds the error log
+    level_dir = os.path.join(OUTPUT_BASE_DIR, f"level{level}")
+    os.makedirs(level_dir, exist_ok=True)
+    error_log_file = os.path.join(level_dir, f"errors_level{level}.log")
+    
+    # Sanitize each title into its output file name once
+    safe_filenames = {topic: topic.translate(_SAFE_FILENAME_TABLE) for topic in articles}
+    
+    # Check which articles already exist (for resume functionality) with a
+    # single directory scan instead of one stat call per article
+    existing = set()
+    if resume:
+        existing = {entry.name[:-3] for entry in os.scandir(level_dir) if entry.name.endswith('.md')}
+    
+    pending = []
+    for topic in articles:
+        if safe_filenames[topic] in existing:
+            stats['skipped'] += 1
+            continue
+        
+        pending.append(topic)
     
     with open(error_log_file, 'w', encoding='utf-8') as error_log:
         error_log.write(f"Error log for Level {level}\n")
         error_log.write(f"Started: {datetime.now().isoformat()}\n")
         error_log.write(f"{'='*60}\n\n")
         
-        # Process each article with progress bar
-        for topic in tqdm(articles, desc=f"Level {level}", unit="article"):
-            # Check if article already exists (for resume functionality)
-            safe_filename = topic.replace('/', '_').replace('\\', '_')
-            output_file = os.path.join(OUTPUT_BASE_DIR, f"level{level}", f"{safe_filename}.md")
-            
-            if resume and os.path.exists(output_file):
-                stats['skipped'] += 1
-                continue
-            
-            # Generate markdown
-            success, markdown_text, error_msg = generate_markdown(topic, download_images)
+        # Fetch articles concurrently; results are saved and logged
+        # as they complete. The semaphore (rather than the connector limit)
+        # bounds requests in flight so that queued requests don't run into
+        # the request timeout while waiting for a connection.
+        semaphore = asyncio.Semaphore(workers)
+        connector = aiohttp.TCPConnector(limit=workers)
+        timeout = aiohttp.ClientTimeout(total=30)
+        
+        async with aiohttp.ClientSession(headers=HEADERS, connector=connector, timeout=timeout) as session:
+            tasks = [
+                generate_markdown_async(session, semaphore, topic, download_images, lang)
+                for topic in pending
+            ]
             
-            if success:
-                save_markdown(level, topic, markdown_text)
-                stats['success'] += 1
-            else:
-                stats['failed'] += 1
-                error_entry = f"{topic}: {error_msg}"
-                stats['errors'].append(error_entry)
-                error_log.write(f"{error_entry}\n")
+            with tqdm(total=total, initial=stats['skipped'], desc=f"Level {level}", unit="article") as progress:
+                for next_result in asyncio.as_completed(tasks):
+                    topic, success, markdown_text, error_msg = await next_result
+                    
+                    if success:
+                        save_markdown(level_dir, safe_filenames[topic], markdown_text)
+                        stats['success'] += 1
+                    else:
+                        stats['failed'] += 1
+                        error_entry = f"{topic}: {error_msg}"
+                        stats['errors'].append(error_entry)
+                        error_log.write(f"{error_entry}\n")
+                    
+                    progress.update(1)
         
         error_log.write(f"\n{'='*60}\n")
         error_log.write(f"Completed: {datetime.now().isoformat()}\n")
@@ -227,6 +361,16 @@ def process_level(level, download_images=False, resume=False):
     return stats
 
 
+def positive_int(value):
+    """
+    Argparse type for options that must be at least 1.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate markdown files for Wikipedia vital articles from JSON data."
@@ -256,12 +400,15 @@ def main():
         default='en',
         help="Wikipedia language code (default: en)"
     )
+    parser.add_argument(
+        '--workers',
+        type=positive_int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of articles to fetch concurrently (default: {DEFAULT_WORKERS})"
+    )
     
     args = parser.parse_args()
     
-    # Set Wikipedia language
-    wikipedia.set_lang(args.lang)
-    
     download_images = args.dl_image == 'yes'
     
     print("=" * 60)
@@ -270,13 +417,15 @@ def main():
     print(f"Processing levels: {args.levels}")
     print(f"Download images: {download_images}")
     print(f"Resume mode: {args.resume}")
+    print(f"Language: {args.lang}")
+    print(f"Workers: {args.workers}")
     print("")
     
     # Process each level
     all_stats = []
     
     for level in sorted(args.levels):
-        stats = process_level(level, download_images, args.resume)
+        stats = asyncio.run(process_level(level, download_images, args.resume, args.workers, args.lang))
         if stats:
             all_stats.append(stats)
     
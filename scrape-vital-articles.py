@@ -6,20 +6,26 @@ This script scrapes the Wikipedia vital articles lists from all 5 levels
 and saves them as JSON files for further processing.
 
 Usage:
-    python3 scrape-vital-articles.py [--levels 1 2 3 4 5]
+    python3 scrape-vital-articles.py [--levels 1 2 3 4 5] [--workers 16] [--no-cache]
 
 Output:
     JSON files in vital_articles_data/ directory, one per level.
 """
 
 import os
-import json
+import re
+import time
+import sqlite3
+import functools
+import threading
+import orjson
 import argparse
-import requests
+import httpx
 import urllib.parse
-from bs4 import BeautifulSoup
+from lxml import etree, html
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Tuple
 
 
 # Base URL for vital articles
@@ -28,6 +34,43 @@ BASE_URL = "https://en.wikipedia.org"
 # Output directory
 OUTPUT_DIR = "vital_articles_data"
 
+# On-disk cache of fetched pages, so re-runs within a day skip the network
+CACHE_FILE = "wiki_scrape_cache.sqlite"
+CACHE_EXPIRE_SECONDS = 24 * 60 * 60
+
+# Number of subpages scraped concurrently
+DEFAULT_WORKERS = 16
+
+# Namespaces whose pages are not articles, e.g. /wiki/Help: or /wiki/User_talk:
+_EXCLUDED_NAMESPACE_RE = re.compile(
+    r'/wiki/(?:Wikipedia|Help|Category|File|Template|Portal|Special|User|MediaWiki|Module|Draft)(?:_talk)?:'
+    r'|/wiki/Talk:'
+)
+
+# Hrefs of all links in the article body. Plain strings, so the cached
+# results do not keep the parsed tree alive.
+_CONTENT_LINKS_XPATH = etree.XPath('//div[@id="mw-content-text"]//a/@href', smart_strings=False)
+
+# Shared HTTP/2 client: concurrent page fetches from the worker threads are
+# multiplexed over a single TLS connection.
+# The User-Agent header avoids 403 errors from Wikipedia.
+_CLIENT = httpx.Client(
+    headers={
+        'User-Agent': 'Wikipedia-Markdown-Generator/1.0 (https://github.com/erictherobot/wikipedia-markdown-generator; Educational purposes)'
+    },
+    timeout=30,
+    follow_redirects=True,
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+    )
+)
+
+# Connection to the page cache, set by open_cache()
+_cache_db = None
+_cache_lock = threading.Lock()
+
 
 def is_valid_article_link(href: str) -> bool:
     """
@@ -37,32 +80,9 @@ def is_valid_article_link(href: str) -> bool:
     if not href or not href.startswith('/wiki/'):
         return False
     
-    # Exclude Wikipedia meta pages and special pages
-    excluded_prefixes = [
-        '/wiki/Wikipedia:',
-        '/wiki/Help:',
-        '/wiki/Category:',
-        '/wiki/File:',
-        '/wiki/Template:',
-        '/wiki/Template_talk:',  # Template talk pages
-        '/wiki/Portal:',
-        '/wiki/Portal_talk:',
-        '/wiki/Special:',
-        '/wiki/Talk:',
-        '/wiki/User:',
-        '/wiki/User_talk:',
-        '/wiki/Wikipedia_talk:',
-        '/wiki/MediaWiki:',
-        '/wiki/MediaWiki_talk:',
-        '/wiki/Module:',
-        '/wiki/Module_talk:',
-        '/wiki/Draft:',
-        '/wiki/Draft_talk:',
-    ]
-    
-    for prefix in excluded_prefixes:
-        if href.startswith(prefix):
-            return False
+    # Exclude Wikipedia meta pages and special pages (and their talk pages)
+    if _EXCLUDED_NAMESPACE_RE.match(href):
+        return False
     
     # Exclude anchor links
     if '#' in href and href.index('#') < len(href) - 1:
@@ -79,45 +99,157 @@ def extract_article_title(href: str) -> str:
     Example: /wiki/%C3%89cole -> École
     """
     if href.startswith('/wiki/'):
-        title = href[6:].split('#')[0]  # Remove /wiki/ prefix and anchors
-        # URL decode to convert percent-encoding to UTF-8
-        title = urllib.parse.unquote(title)
+        title = href[6:].partition('#')[0]  # Remove /wiki/ prefix and anchors
+        # URL decode to convert percent-encoding to UTF-8; most English
+        # titles contain none, so skip unquote for those
+        if '%' in title:
+            title = urllib.parse.unquote(title)
         return title
     return href
 
 
-def get_subpage_links(soup, level: int) -> List[str]:
+def open_cache(path: str = CACHE_FILE) -> None:
+    """
+    Open (or create) the on-disk page cache.
+    Until this is called, every page is fetched from Wikipedia.
+    
+    Args:
+        path: Path of the SQLite cache file
+    """
+    global _cache_db
+    _cache_db = sqlite3.connect(path, check_same_thread=False)
+    
+    with _cache_lock, _cache_db:
+        _cache_db.execute(
+            'CREATE TABLE IF NOT EXISTS pages '
+            '(url TEXT PRIMARY KEY, fetched_at REAL NOT NULL, content BLOB NOT NULL)'
+        )
+
+
+def _fetch_page(url: str) -> bytes:
+    """
+    Fetch the body of a page, served from the on-disk cache when a copy
+    younger than CACHE_EXPIRE_SECONDS is available.
+    
+    Args:
+        url: URL of the page to fetch
+        
+    Returns:
+        Raw page content
+        
+    Raises:
+        httpx.HTTPError: If the page could not be fetched
+    """
+    if _cache_db is not None:
+        with _cache_lock:
+            row = _cache_db.execute(
+                'SELECT content FROM pages WHERE url = ? AND fetched_at > ?',
+                (url, time.time() - CACHE_EXPIRE_SECONDS)
+            ).fetchone()
+        if row:
+            return row[0]
+    
+    response = _CLIENT.get(url)
+    response.raise_for_status()
+    
+    # Don't cache empty bodies, or a bad response would be replayed for a day
+    if _cache_db is not None and response.content.strip():
+        with _cache_lock, _cache_db:
+            _cache_db.execute(
+                'INSERT OR REPLACE INTO pages (url, fetched_at, content) VALUES (?, ?, ?)',
+                (url, time.time(), response.content)
+            )
+    
+    return response.content
+
+
+@functools.lru_cache(maxsize=4096)
+def _get_links(url: str) -> Tuple[str, ...]:
+    """
+    Fetch a page and return the hrefs of all links in its content area.
+    Results are cached per URL, so a page linked from several parents
+    is only downloaded and parsed once.
+    
+    Args:
+        url: URL of the page to fetch
+        
+    Returns:
+        Tuple of hrefs, in page order
+        
+    Raises:
+        httpx.HTTPError: If the page could not be fetched
+    """
+    content = _fetch_page(url)
+    
+    # lxml refuses to parse an empty document; such a page has no links
+    try:
+        document = html.fromstring(content)
+    except etree.ParserError:
+        return ()
+    
+    return tuple(_CONTENT_LINKS_XPATH(document))
+
+
+@functools.lru_cache(maxsize=4096)
+def _subpage_re(prefix: str) -> re.Pattern:
+    """
+    Compile (once per prefix) the pattern matching subpage hrefs below a path,
+    excluding anchors and talk pages.
+    """
+    return re.compile(re.escape(prefix) + r'(?![^#]*Talk:)[^#]+')
+
+
+def _find_subpage_links(links: Tuple[str, ...], prefix: str) -> List[str]:
+    """
+    Find links to subpages below a given path, excluding anchors and talk pages.
+    
+    Args:
+        links: Hrefs from the content area of a page
+        prefix: Path the subpages start with, including the trailing slash
+        
+    Returns:
+        List of unique subpage URLs, in page order
+    """
+    # filter() drives the compiled matcher from C; only matches reach Python
+    subpage_hrefs = dict.fromkeys(filter(_subpage_re(prefix).fullmatch, links))
+    
+    return [BASE_URL + href for href in subpage_hrefs]
+
+
+def get_subpage_links(links: Tuple[str, ...], level: int) -> List[str]:
     """
     Extract subpage links for levels that use subpages (levels 4-5).
     
     Args:
-        soup: BeautifulSoup object of the main level page
+        links: Hrefs from the content area of the main level page
         level: The level number (4 or 5)
         
     Returns:
         List of subpage URLs
     """
-    subpage_links = []
-    content_div = soup.find('div', {'id': 'mw-content-text'})
-    
-    if not content_div:
-        return subpage_links
-    
     # Pattern for subpage links: /wiki/Wikipedia:Vital_articles/Level/N/...
-    subpage_pattern = f'/wiki/Wikipedia:Vital_articles/Level/{level}/'
+    return _find_subpage_links(links, f'/wiki/Wikipedia:Vital_articles/Level/{level}/')
+
+
+def _extract_articles(links: Tuple[str, ...]) -> Set[str]:
+    """
+    Extract article titles from the hrefs of an already fetched page.
     
-    for link in content_div.find_all('a', href=True):
-        href = link.get('href', '')
+    Args:
+        links: Hrefs from the content area of the page
         
-        # Check if this is a subpage link (not the main level page itself)
-        if href.startswith(subpage_pattern) and href != f'/wiki/Wikipedia:Vital_articles/Level/{level}':
-            # Exclude anchors and talk pages
-            if '#' not in href and 'Talk:' not in href:
-                full_url = BASE_URL + href
-                if full_url not in subpage_links:
-                    subpage_links.append(full_url)
+    Returns:
+        Set of article titles
+    """
+    articles: Set[str] = set()
     
-    return subpage_links
+    for href in links:
+        if is_valid_article_link(href):
+            title = extract_article_title(href)
+            if title:
+                articles.add(title)
+    
+    return articles
 
 
 def scrape_articles_from_page(url: str) -> Set[str]:
@@ -130,34 +262,13 @@ def scrape_articles_from_page(url: str) -> Set[str]:
     Returns:
         Set of article titles
     """
-    headers = {
-        'User-Agent': 'Wikipedia-Markdown-Generator/1.0 (https://github.com/erictherobot/wikipedia-markdown-generator; Educational purposes)'
-    }
-    
     try:
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-    except requests.RequestException as e:
+        links = _get_links(url)
+    except httpx.HTTPError as e:
         print(f"  Error fetching {url}: {e}")
         return set()
     
-    soup = BeautifulSoup(response.content, 'lxml')
-    content_div = soup.find('div', {'id': 'mw-content-text'})
-    
-    if not content_div:
-        return set()
-    
-    articles: Set[str] = set()
-    
-    for link in content_div.find_all('a', href=True):
-        href = link.get('href', '')
-        
-        if is_valid_article_link(href):
-            title = extract_article_title(href)
-            if title:
-                articles.add(title)
-    
-    return articles
+    return _extract_articles(links)
 
 
 def scrape_page_with_subpages(url: str, level: int, depth: int = 0) -> Set[str]:
@@ -172,55 +283,35 @@ def scrape_page_with_subpages(url: str, level: int, depth: int = 0) -> Set[str]:
     Returns:
         Set of article titles from this page and all its subpages
     """
-    headers = {
-        'User-Agent': 'Wikipedia-Markdown-Generator/1.0 (https://github.com/erictherobot/wikipedia-markdown-generator; Educational purposes)'
-    }
-    
     try:
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-    except requests.RequestException as e:
+        links = _get_links(url)
+    except httpx.HTTPError as e:
         print(f"{'  ' * depth}Error fetching {url}: {e}")
         return set()
     
-    soup = BeautifulSoup(response.content, 'lxml')
-    
     # Check if this page has subpages
-    subpage_pattern = url.rstrip('/') + '/'
-    has_subpages = False
-    nested_subpage_links = []
-    
-    content_div = soup.find('div', {'id': 'mw-content-text'})
-    if content_div:
-        for link in content_div.find_all('a', href=True):
-            href = link.get('href', '')
-            if href.startswith('/wiki/Wikipedia:Vital_articles/Level/'):
-                full_url = BASE_URL + href
-                # Check if this is a subpage of the current page
-                if full_url.startswith(subpage_pattern) and full_url != url and '#' not in href and 'Talk:' not in href:
-                    has_subpages = True
-                    if full_url not in nested_subpage_links:
-                        nested_subpage_links.append(full_url)
+    nested_subpage_links = _find_subpage_links(links, url[len(BASE_URL):].rstrip('/') + '/')
     
     # If this page has subpages, recursively scrape them
-    if has_subpages and nested_subpage_links:
+    if nested_subpage_links:
         all_articles: Set[str] = set()
         for subpage_url in nested_subpage_links:
             subpage_articles = scrape_page_with_subpages(subpage_url, level, depth + 1)
             all_articles.update(subpage_articles)
         return all_articles
     else:
-        # No subpages, scrape articles from this page
-        return scrape_articles_from_page(url)
+        # No subpages, extract articles from the links fetched above
+        return _extract_articles(links)
 
 
-def scrape_vital_articles_level(level: int) -> List[str]:
+def scrape_vital_articles_level(level: int, workers: int = DEFAULT_WORKERS) -> List[str]:
     """
     Scrape all article titles from a specific vital articles level page.
     For levels 4-5, this includes following subpage links recursively.
     
     Args:
         level: The level number (1-5)
+        workers: Number of subpages to scrape concurrently
         
     Returns:
         List of article titles
@@ -228,23 +319,15 @@ def scrape_vital_articles_level(level: int) -> List[str]:
     url = f"{BASE_URL}/wiki/Wikipedia:Vital_articles/Level/{level}"
     print(f"\nScraping Level {level} from {url}...")
     
-    # Add User-Agent header to avoid 403 errors
-    headers = {
-        'User-Agent': 'Wikipedia-Markdown-Generator/1.0 (https://github.com/erictherobot/wikipedia-markdown-generator; Educational purposes)'
-    }
-    
     try:
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-    except requests.RequestException as e:
+        links = _get_links(url)
+    except httpx.HTTPError as e:
         print(f"Error fetching Level {level}: {e}")
         return []
     
-    soup = BeautifulSoup(response.content, 'lxml')
-    
     # For levels 4-5, check if there are subpages
     if level in [4, 5]:
-        subpage_links = get_subpage_links(soup, level)
+        subpage_links = get_subpage_links(links, level)
         
         if subpage_links:
             print(f"Found {len(subpage_links)} subpages for Level {level}")
@@ -252,27 +335,32 @@ def scrape_vital_articles_level(level: int) -> List[str]:
             
             articles: Set[str] = set()
             
-            # Scrape each subpage (recursively if needed)
-            for i, subpage_url in enumerate(subpage_links, 1):
-                subpage_name = subpage_url.split('/')[-1]
-                print(f"  [{i}/{len(subpage_links)}] Scraping {subpage_name}...", end=' ', flush=True)
-                
-                # Use recursive scraping to handle nested subpages
-                subpage_articles = scrape_page_with_subpages(subpage_url, level)
-                articles.update(subpage_articles)
+            # Scrape subpages concurrently; each worker follows the nested
+            # subpages of its own subpage recursively
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(scrape_page_with_subpages, subpage_url, level): subpage_url
+                    for subpage_url in subpage_links
+                }
                 
-                print(f"({len(subpage_articles)} articles)")
+                for i, future in enumerate(as_completed(futures), 1):
+                    subpage_name = futures[future].split('/')[-1]
+                    subpage_articles = future.result()
+                    articles.update(subpage_articles)
+                    
+                    print(f"  [{i}/{len(subpage_links)}] Scraped {subpage_name} ({len(subpage_articles)} articles)")
             
-            article_list = sorted(list(articles))
+            article_list = sorted(articles)
             print(f"\nTotal unique articles found for Level {level}: {len(article_list)}")
             return article_list
     
-    # For levels 1-3, or if no subpages found, scrape directly from main page
+    # For levels 1-3, or if no subpages found, extract articles from the
+    # main page links fetched above
     print(f"Scraping articles from main page...")
-    articles = scrape_articles_from_page(url)
+    articles = _extract_articles(links)
     
     # Convert to sorted list for consistent output
-    article_list = sorted(list(articles))
+    article_list = sorted(articles)
     
     print(f"Found {len(article_list)} unique articles for Level {level}")
     return article_list
@@ -300,13 +388,23 @@ def save_to_json(level: int, articles: List[str]) -> str:
     
     filename = os.path.join(OUTPUT_DIR, f"vital_articles_level{level}.json")
     
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(data))
     
     print(f"Saved to {filename}")
     return filename
 
 
+def positive_int(value: str) -> int:
+    """
+    Argparse type for options that must be at least 1.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Scrape Wikipedia vital articles lists and save to JSON files."
@@ -319,18 +417,33 @@ def main():
         choices=[1, 2, 3, 4, 5],
         help="Specify which levels to scrape (default: all 5 levels)"
     )
+    parser.add_argument(
+        '--workers',
+        type=positive_int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of subpages to scrape concurrently (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f"Always fetch pages from Wikipedia instead of the on-disk cache ({CACHE_FILE})"
+    )
     
     args = parser.parse_args()
     
+    if not args.no_cache:
+        open_cache()
+    
     print("=" * 60)
     print("Wikipedia Vital Articles Scraper")
     print("=" * 60)
     print(f"Scraping levels: {args.levels}")
+    print(f"Page cache: {'disabled' if args.no_cache else CACHE_FILE}")
     
     total_articles = 0
     
     for level in sorted(args.levels):
-        articles = scrape_vital_articles_level(level)
+        articles = scrape_vital_articles_level(level, args.workers)
         if articles:
             save_to_json(level, articles)
             total_articles += len(articles)